@@ -1,12 +1,18 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional, Any, Dict
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ValidationError
+import msgspec
+from typing import List, Optional, Any, Dict, Tuple, Union, BinaryIO
 import pandas as pd
 import numpy as np
 # from prophet import Prophet  # Commented out - using simple forecasting instead
-from simple_forecasting import linear_trend_forecast, moving_average_forecast, exponential_smoothing_forecast
+from simple_forecasting import linear_trend_forecast, moving_average_forecast, exponential_smoothing_forecast, fit_linear_trend
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 
 # Prophet / CmdStan diagnostic flags (filled by check_prophet_status)
@@ -14,10 +20,45 @@ PROPHET_AVAILABLE = False
 PROPHET_IMPORT_ERROR: Optional[str] = None
 CMDSTAN_INSTALLED = False
 CMDSTAN_PATH: Optional[str] = None
+# Last diagnostics; populated lazily because importing prophet/cmdstanpy takes seconds
+PROPHET_DIAGNOSTICS: Optional[Dict[str, Any]] = None
 
-def check_prophet_status() -> Dict[str, Any]:
-    """Check whether Prophet and CmdStan are available and return diagnostics."""
-    global PROPHET_AVAILABLE, PROPHET_IMPORT_ERROR, CMDSTAN_INSTALLED, CMDSTAN_PATH
+# Cached (timestamp, diagnostics) from the last check; constructing Prophet() is expensive
+_PROPHET_STATUS_CACHE: Optional[Tuple[float, Dict[str, Any]]] = None
+_PROPHET_STATUS_TTL = 300  # seconds
+# Serializes the uncached check so concurrent requests never import/construct Prophet twice
+_PROPHET_STATUS_LOCK = threading.Lock()
+
+def _cached_prophet_status() -> Optional[Dict[str, Any]]:
+    """Return a copy of the cached diagnostics if they are younger than _PROPHET_STATUS_TTL"""
+    if _PROPHET_STATUS_CACHE is not None:
+        cached_at, cached_diagnostics = _PROPHET_STATUS_CACHE
+        if time.time() - cached_at < _PROPHET_STATUS_TTL:
+            return dict(cached_diagnostics)
+    return None
+
+def check_prophet_status(force: bool = False) -> Dict[str, Any]:
+    """Check whether Prophet and CmdStan are available and return diagnostics.
+
+    Results are cached for _PROPHET_STATUS_TTL seconds; pass force=True to re-run the check.
+    The check imports prophet and builds a model, so call it off the event loop.
+    """
+    if not force:
+        cached = _cached_prophet_status()
+        if cached is not None:
+            return cached
+
+    with _PROPHET_STATUS_LOCK:
+        # Another caller may have refreshed the cache while this one waited for the lock
+        if not force:
+            cached = _cached_prophet_status()
+            if cached is not None:
+                return cached
+        return _run_prophet_checks()
+
+def _run_prophet_checks() -> Dict[str, Any]:
+    """Import Prophet/cmdstanpy, update the module-level flags and refresh the status cache"""
+    global PROPHET_AVAILABLE, PROPHET_IMPORT_ERROR, CMDSTAN_INSTALLED, CMDSTAN_PATH, PROPHET_DIAGNOSTICS, _PROPHET_STATUS_CACHE
     PROPHET_AVAILABLE = False
     PROPHET_IMPORT_ERROR = None
     CMDSTAN_INSTALLED = False
@@ -72,12 +113,16 @@ def check_prophet_status() -> Dict[str, Any]:
         diagnostics['cmdstanpy_available'] = False
         diagnostics['cmdstan_installed'] = False
 
+    PROPHET_DIAGNOSTICS = diagnostics
+    _PROPHET_STATUS_CACHE = (time.time(), dict(diagnostics))
     return diagnostics
 
-# Run diagnostic on import/startup
-PROPHET_DIAGNOSTICS = check_prophet_status()
+import asyncio
 import io
 import json
+import zipfile
+import openpyxl
+from openpyxl.utils.exceptions import InvalidFileException
 from datetime import datetime
 import logging
 
@@ -85,7 +130,8 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Prophet Forecasting API", version="1.0.0")
+# orjson encodes the large float arrays in forecast responses much faster than stdlib json
+app = FastAPI(title="Prophet Forecasting API", version="1.0.0", default_response_class=ORJSONResponse)
 
 # Enable CORS for React frontend and production deployments
 app.add_middleware(
@@ -118,9 +164,36 @@ class ForecastConfig(BaseModel):
     country_holidays: Optional[str] = None
     forecast_method: str = "linear_trend"  # New: linear_trend, moving_average, exponential_smoothing
 
-class ForecastRequest(BaseModel):
-    data: List[DataPoint]
-    config: ForecastConfig
+# /api/forecast request bodies are decoded with msgspec: thousands of data points
+# are typed in C instead of going through Pydantic validators one by one
+class DataPointStruct(msgspec.Struct):
+    ds: str
+    y: float
+
+class ForecastRequest(msgspec.Struct):
+    data: List[DataPointStruct]
+    config: Dict[str, Any]  # validated with ForecastConfig
+
+def forecast_request_schema() -> Dict[str, Any]:
+    """OpenAPI schema for the /api/forecast body: ForecastRequest with its references inlined
+    and config described by ForecastConfig"""
+    (root,), components = msgspec.json.schema_components([ForecastRequest], ref_template="{name}")
+
+    def inline(node):
+        if isinstance(node, dict):
+            if '$ref' in node:
+                return inline(components[node['$ref']])
+            return {key: inline(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [inline(value) for value in node]
+        return node
+
+    schema = inline(root)
+    if hasattr(ForecastConfig, 'model_json_schema'):  # Pydantic v2
+        schema['properties']['config'] = ForecastConfig.model_json_schema()
+    else:
+        schema['properties']['config'] = ForecastConfig.schema()
+    return schema
 
 class ForecastPoint(BaseModel):
     ds: str
@@ -138,22 +211,69 @@ class ForecastResponse(BaseModel):
     forecast: List[ForecastPoint]
     metrics: Optional[ForecastMetrics] = None
 
+def construct_model(model_cls, **values):
+    """Build a model without field validation, for values the server already typed itself"""
+    if hasattr(model_cls, 'model_construct'):  # Pydantic v2
+        return model_cls.model_construct(**values)
+    return model_cls.construct(**values)
+
 def calculate_metrics(actual: np.ndarray, predicted: np.ndarray) -> ForecastMetrics:
     """Calculate forecast accuracy metrics"""
-    mae = np.mean(np.abs(actual - predicted))
-    rmse = np.sqrt(np.mean((actual - predicted) ** 2))
+    actual = np.asarray(actual, dtype=np.float64)
+    predicted = np.asarray(predicted, dtype=np.float64)
+    
+    # Reuse one residual buffer and one absolute-residual buffer for all three metrics
+    residuals = actual - predicted
+    abs_residuals = np.abs(residuals)
+    mae = abs_residuals.mean()
+    rmse = np.sqrt(np.dot(residuals, residuals) / residuals.size)
     
     # Calculate MAPE, avoid division by zero
-    mape_values = np.abs((actual - predicted) / np.where(actual != 0, actual, 1))
-    mape = np.mean(mape_values) * 100
+    safe_actual = np.where(actual != 0, actual, 1.0)
+    abs_residuals /= np.abs(safe_actual)
+    mape = abs_residuals.mean() * 100
     
-    return ForecastMetrics(mae=mae, rmse=rmse, mape=mape)
+    return ForecastMetrics(mae=float(mae), rmse=float(rmse), mape=float(mape))
+
+def read_excel_columns(source: BinaryIO) -> pd.DataFrame:
+    """Read the 'ds' and 'y' columns of the first sheet into a DataFrame.
+
+    .xlsx files are streamed with openpyxl's read-only mode; legacy .xls
+    files (not zip archives) fall back to pandas/xlrd.
+    """
+    try:
+        wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile):
+        source.seek(0)
+        return pd.read_excel(source)
+
+    try:
+        ws = wb.worksheets[0]  # always the first sheet, like pd.read_excel
+        # Read-only mode trusts the sheet's stored <dimension>, which some exporters leave stale
+        ws.reset_dimensions()
+        rows = ws.iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        if 'ds' not in header or 'y' not in header:
+            raise ValueError("Excel file must contain 'ds' (date) and 'y' (value) columns")
+        ds_idx = header.index('ds')
+        y_idx = header.index('y')
+
+        ds_list = []
+        y_list = []
+        for row in rows:
+            ds_list.append(row[ds_idx] if ds_idx < len(row) else None)
+            y_list.append(row[y_idx] if y_idx < len(row) else None)
+    finally:
+        wb.close()
 
-def parse_excel_file(file_content: bytes) -> List[DataPoint]:
-    """Parse Excel file and return data points"""
+    return pd.DataFrame({'ds': ds_list, 'y': y_list})
+
+def parse_excel_file(file_content: Union[bytes, BinaryIO]) -> List[DataPoint]:
+    """Parse Excel file (raw bytes or a seekable binary file object) and return data points"""
     try:
         # Try reading as Excel file
-        df = pd.read_excel(io.BytesIO(file_content))
+        source = io.BytesIO(file_content) if isinstance(file_content, bytes) else file_content
+        df = read_excel_columns(source)
         
         # Check if required columns exist
         if 'ds' not in df.columns or 'y' not in df.columns:
@@ -166,17 +286,16 @@ def parse_excel_file(file_content: bytes) -> List[DataPoint]:
         # Format ds column as string in YYYY-MM-DD format
         df['ds'] = df['ds'].dt.strftime('%Y-%m-%d')
         
+        # Coerce non-numeric values to NaN so they are dropped with the missing rows
+        df['y'] = pd.to_numeric(df['y'], errors='coerce')
+        
         # Remove rows with missing values
         df = df.dropna(subset=['ds', 'y'])
         
         # Convert to list of DataPoint objects
-        data_points = []
-        for _, row in df.iterrows():
-            try:
-                data_points.append(DataPoint(ds=row['ds'], y=float(row['y'])))
-            except (ValueError, TypeError) as e:
-                logger.warning(f"Skipping invalid row: {row}. Error: {e}")
-                continue
+        ds_values = df['ds'].tolist()
+        y_values = df['y'].astype(float).tolist()
+        data_points = [construct_model(DataPoint, ds=ds, y=y) for ds, y in zip(ds_values, y_values)]
         
         if len(data_points) == 0:
             raise ValueError("No valid data points found in the file")
@@ -193,10 +312,12 @@ async def root():
 
 
 @app.get("/api/prophet_status")
-async def prophet_status():
+async def prophet_status(force: bool = False):
     """Return diagnostics about Prophet and CmdStan availability."""
     try:
-        diag = check_prophet_status()
+        # An uncached check imports prophet and takes seconds; keep it off the event loop
+        loop = asyncio.get_running_loop()
+        diag = await loop.run_in_executor(None, check_prophet_status, force)
         return diag
     except Exception as e:
         logger.error(f"Error while checking prophet status: {e}")
@@ -210,11 +331,10 @@ async def upload_file(file: UploadFile = File(...)):
         if not file.filename.endswith(('.xls', '.xlsx')):
             raise HTTPException(status_code=400, detail="File must be an Excel file (.xls or .xlsx)")
         
-        # Read file content
-        content = await file.read()
-        
-        # Parse Excel file
-        data_points = parse_excel_file(content)
+        # Parse straight from the upload's spooled temporary file instead of
+        # materializing the whole workbook as a bytes object
+        await file.seek(0)
+        data_points = parse_excel_file(file.file)
         
         logger.info(f"Successfully parsed {len(data_points)} data points from {file.filename}")
         
@@ -229,24 +349,78 @@ async def upload_file(file: UploadFile = File(...)):
         logger.error(f"Unexpected error: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@app.post("/api/forecast", response_model=ForecastResponse)
-async def generate_forecast(request: ForecastRequest):
+# The body is read raw and decoded with msgspec, so its schema is supplied for /docs explicitly
+@app.post(
+    "/api/forecast",
+    response_model=ForecastResponse,
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/json": {"schema": forecast_request_schema()}},
+            "required": True,
+        }
+    },
+)
+async def generate_forecast(request: Request):
     """Generate forecast using simple forecasting methods"""
+    body = await request.body()
+    # Decoding and forecasting are CPU-bound; run them in the default thread pool so the event loop stays responsive
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _compute_forecast_sync, body)
+
+# Recent responses keyed by a digest of the raw request body, most recently used last.
+# Only the digest is kept, never the request payload itself.
+_FORECAST_CACHE: "OrderedDict[bytes, ForecastResponse]" = OrderedDict()
+_FORECAST_CACHE_SIZE = 64
+_FORECAST_CACHE_LOCK = threading.Lock()
+
+def _compute_forecast_sync(body: bytes) -> ForecastResponse:
+    """Synchronous forecast entry point, executed off the event loop"""
+    # Identical payloads (e.g. re-submitted while tweaking display options) are served from cache
+    key = hashlib.blake2b(body, digest_size=16).digest()
+    with _FORECAST_CACHE_LOCK:
+        cached = _FORECAST_CACHE.get(key)
+        if cached is not None:
+            _FORECAST_CACHE.move_to_end(key)
+            return cached
+    
+    try:
+        # Lax mode keeps Pydantic's coercions, e.g. numeric strings for y
+        forecast_request = msgspec.json.decode(body, type=ForecastRequest, strict=False)
+        config = ForecastConfig(**forecast_request.config)
+    except (msgspec.DecodeError, msgspec.ValidationError, ValidationError) as e:
+        raise HTTPException(status_code=422, detail=f"Invalid forecast request: {e}")
+    
+    response = _run_forecast(forecast_request.data, config)
+    with _FORECAST_CACHE_LOCK:
+        _FORECAST_CACHE[key] = response
+        if len(_FORECAST_CACHE) > _FORECAST_CACHE_SIZE:
+            _FORECAST_CACHE.popitem(last=False)
+    return response
+
+def _run_forecast(data: List[DataPointStruct], config: ForecastConfig) -> ForecastResponse:
+    """Run the forecast for decoded data points and a validated config"""
     try:
         # Convert data to DataFrame
-        df = pd.DataFrame([{"ds": dp.ds, "y": dp.y} for dp in request.data])
+        df = pd.DataFrame({'ds': [dp.ds for dp in data], 'y': [dp.y for dp in data]})
         
-        # Ensure ds column is datetime
-        df['ds'] = pd.to_datetime(df['ds'])
+        # Ensure ds column is datetime; uploads are normalized to YYYY-MM-DD, so try that format first
+        try:
+            df['ds'] = pd.to_datetime(df['ds'], format='%Y-%m-%d', cache=True)
+        except ValueError:
+            # Other date spellings (e.g. ISO timestamps) go through the inferring parser
+            try:
+                df['ds'] = pd.to_datetime(df['ds'], cache=True)
+            except (ValueError, TypeError) as e:
+                raise HTTPException(status_code=422, detail=f"Invalid date in 'ds': {e}")
         
         # Sort by date
         df = df.sort_values('ds').reset_index(drop=True)
         
-        logger.info(f"Starting forecast with {len(df)} data points, method={request.config.forecast_method}")
+        logger.info(f"Starting forecast with {len(df)} data points, method={config.forecast_method}")
 
         # If user explicitly requested Prophet, attempt it and provide actionable errors if it's not ready
-        if request.config.forecast_method == 'prophet':
-            # Re-check Prophet availability at request time
+        if config.forecast_method == 'prophet':
+            # Check Prophet availability (served from cache unless the last check is stale)
             diag = check_prophet_status()
             if not diag.get('prophet_functional', False):
                 error_msg = diag.get('prophet_error', diag.get('prophet_import_error', 'Unknown Prophet error'))
@@ -263,42 +437,41 @@ async def generate_forecast(request: ForecastRequest):
 
             # Initialize Prophet model
             model = Prophet(
-                yearly_seasonality=request.config.yearly_seasonality,
-                weekly_seasonality=request.config.weekly_seasonality,
-                daily_seasonality=request.config.daily_seasonality,
-                changepoint_prior_scale=request.config.changepoint_prior_scale,
-                seasonality_prior_scale=request.config.seasonality_prior_scale,
-                holidays_prior_scale=request.config.holidays_prior_scale
+                yearly_seasonality=config.yearly_seasonality,
+                weekly_seasonality=config.weekly_seasonality,
+                daily_seasonality=config.daily_seasonality,
+                changepoint_prior_scale=config.changepoint_prior_scale,
+                seasonality_prior_scale=config.seasonality_prior_scale,
+                holidays_prior_scale=config.holidays_prior_scale
             )
 
             # Add country holidays if specified
-            if request.config.country_holidays:
+            if config.country_holidays:
                 try:
-                    model.add_country_holidays(country_name=request.config.country_holidays)
+                    model.add_country_holidays(country_name=config.country_holidays)
                 except Exception as e:
-                    logger.warning(f"Could not add holidays for {request.config.country_holidays}: {e}")
+                    logger.warning(f"Could not add holidays for {config.country_holidays}: {e}")
 
             # Fit the model
             model.fit(df)
 
             # Create future dataframe
-            future = model.make_future_dataframe(periods=request.config.periods)
+            future = model.make_future_dataframe(periods=config.periods)
 
             # Generate forecast
             forecast_df = model.predict(future)
         else:
             # Use simple forecasting fallbacks (fast, pure-python)
-            if request.config.forecast_method == 'moving_average':
-                forecast_df = moving_average_forecast(df, periods=request.config.periods)
-            elif request.config.forecast_method == 'exponential_smoothing':
-                forecast_df = exponential_smoothing_forecast(df, periods=request.config.periods)
+            if config.forecast_method == 'moving_average':
+                forecast_df = moving_average_forecast(df, periods=config.periods)
+            elif config.forecast_method == 'exponential_smoothing':
+                forecast_df = exponential_smoothing_forecast(df, periods=config.periods)
             else:
                 # Default to linear trend
-                forecast_df = linear_trend_forecast(df, periods=request.config.periods)
+                forecast_df = linear_trend_forecast(df, periods=config.periods)
         
-        # Split historical and forecast data
-        historical_data = df.copy()
-        forecast_data = forecast_df.tail(request.config.periods).copy()
+        # Split off the future rows; the historical part of the response is read straight from df
+        forecast_data = forecast_df.tail(config.periods)
         
         # Calculate metrics using cross-validation on historical data
         metrics = None
@@ -310,21 +483,21 @@ async def generate_forecast(request: ForecastRequest):
                 test_df = df.iloc[split_point:]
                 
                 # Fit model on training data based on the forecast method used
-                if request.config.forecast_method == 'prophet':
+                if config.forecast_method == 'prophet':
                     # Only use Prophet for metrics calculation if we're using Prophet for forecasting
                     from prophet import Prophet  # type: ignore
                     val_model = Prophet(
-                        yearly_seasonality=request.config.yearly_seasonality,
-                        weekly_seasonality=request.config.weekly_seasonality,
-                        daily_seasonality=request.config.daily_seasonality,
-                        changepoint_prior_scale=request.config.changepoint_prior_scale,
-                        seasonality_prior_scale=request.config.seasonality_prior_scale,
-                        holidays_prior_scale=request.config.holidays_prior_scale
+                        yearly_seasonality=config.yearly_seasonality,
+                        weekly_seasonality=config.weekly_seasonality,
+                        daily_seasonality=config.daily_seasonality,
+                        changepoint_prior_scale=config.changepoint_prior_scale,
+                        seasonality_prior_scale=config.seasonality_prior_scale,
+                        holidays_prior_scale=config.holidays_prior_scale
                     )
                     
-                    if request.config.country_holidays:
+                    if config.country_holidays:
                         try:
-                            val_model.add_country_holidays(country_name=request.config.country_holidays)
+                            val_model.add_country_holidays(country_name=config.country_holidays)
                         except:
                             pass
                     
@@ -334,17 +507,18 @@ async def generate_forecast(request: ForecastRequest):
                     test_future = val_model.make_future_dataframe(periods=len(test_df))
                     test_forecast = val_model.predict(test_future)
                     test_predictions = test_forecast.tail(len(test_df))['yhat'].values
-                else:
-                    # Use the same simple forecasting method for validation
-                    if request.config.forecast_method == 'moving_average':
-                        val_forecast = moving_average_forecast(train_df, periods=len(test_df))
-                    elif request.config.forecast_method == 'exponential_smoothing':
-                        val_forecast = exponential_smoothing_forecast(train_df, periods=len(test_df))
-                    else:
-                        # Default to linear trend
-                        val_forecast = linear_trend_forecast(train_df, periods=len(test_df))
-                    
+                elif config.forecast_method == 'moving_average':
+                    # Weekly pattern depends on the training window, so re-run on the split
+                    val_forecast = moving_average_forecast(train_df, periods=len(test_df))
                     test_predictions = val_forecast.tail(len(test_df))['yhat'].values
+                elif config.forecast_method == 'exponential_smoothing':
+                    # Smoothing is causal: the last in-sample value at the split is the training-only forecast
+                    last_smoothed = forecast_df['yhat'].iat[split_point - 1]
+                    test_predictions = np.full(len(test_df), last_smoothed)
+                else:
+                    # Default to linear trend: closed-form refit on the training slice only
+                    slope, intercept = fit_linear_trend(train_df['y'].to_numpy(np.float64))
+                    test_predictions = slope * np.arange(split_point, len(df)) + intercept
                 
                 # Calculate metrics
                 metrics = calculate_metrics(test_df['y'].values, test_predictions)
@@ -354,23 +528,27 @@ async def generate_forecast(request: ForecastRequest):
         
         # Format response
         historical = [
-            DataPoint(ds=row['ds'].strftime('%Y-%m-%d'), y=row['y'])
-            for _, row in historical_data.iterrows()
+            construct_model(DataPoint, ds=ds, y=y)
+            for ds, y in zip(
+                df['ds'].dt.strftime('%Y-%m-%d').tolist(),
+                df['y'].astype(float).tolist()
+            )
         ]
         
         forecast = [
-            ForecastPoint(
-                ds=row['ds'].strftime('%Y-%m-%d'),
-                yhat=row['yhat'],
-                yhat_lower=row['yhat_lower'],
-                yhat_upper=row['yhat_upper']
+            construct_model(ForecastPoint, ds=ds, yhat=yhat, yhat_lower=yhat_lower, yhat_upper=yhat_upper)
+            for ds, yhat, yhat_lower, yhat_upper in zip(
+                forecast_data['ds'].dt.strftime('%Y-%m-%d').tolist(),
+                forecast_data['yhat'].to_numpy(dtype=float).tolist(),
+                forecast_data['yhat_lower'].to_numpy(dtype=float).tolist(),
+                forecast_data['yhat_upper'].to_numpy(dtype=float).tolist()
             )
-            for _, row in forecast_data.iterrows()
         ]
         
         logger.info(f"Successfully generated forecast with {len(forecast)} future points")
         
-        return ForecastResponse(
+        return construct_model(
+            ForecastResponse,
             historical=historical,
             forecast=forecast,
             metrics=metrics
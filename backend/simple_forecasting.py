@@ -5,140 +5,162 @@ Simple forecasting backends that don't require Prophet/CmdStan
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from datetime import datetime
+from typing import List, Dict, Any, Tuple
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to plain Python loops
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+@njit(cache=True, fastmath=True)
+def _ewma_loop(y: np.ndarray, alpha: float) -> np.ndarray:
+    """Exponentially weighted recurrence s[i] = alpha * y[i] + (1 - alpha) * s[i-1]"""
+    out = np.empty_like(y)
+    out[0] = y[0]
+    for i in range(1, y.size):
+        out[i] = alpha * y[i] + (1 - alpha) * out[i - 1]
+    return out
+
+@njit(cache=True)
+def _sma(y: np.ndarray, w: int) -> np.ndarray:
+    """Trailing simple moving average with min_periods=1 semantics (running-sum update)"""
+    out = np.empty_like(y)
+    total = 0.0  # float64 accumulator so float32 input does not drift over long series
+    for i in range(y.size):
+        total += y[i]
+        if i >= w:
+            total -= y[i - w]
+            out[i] = total / w
+        else:
+            out[i] = total / (i + 1)
+    return out
+
+def _prepare_history(data: pd.DataFrame) -> pd.DataFrame:
+    """Return the input sorted by date with a datetime ds column (sorting already yields a new frame)"""
+    df = data
+    if not pd.api.types.is_datetime64_any_dtype(df['ds']):
+        df = df.assign(ds=pd.to_datetime(df['ds'], format='%Y-%m-%d', cache=True))
+    return df.sort_values('ds').reset_index(drop=True)
+
+def _combine_forecast(hist_ds: np.ndarray, hist_yhat: np.ndarray, future_ds: pd.DatetimeIndex,
+                      future_yhat: np.ndarray, band: float) -> pd.DataFrame:
+    """Stack historical and future ds/yhat into one preallocated frame and add the +/- band interval"""
+    n = len(hist_ds)
+    total = n + len(future_ds)
+    
+    ds_all = np.empty(total, dtype='datetime64[ns]')
+    ds_all[:n] = hist_ds
+    ds_all[n:] = future_ds.to_numpy(dtype='datetime64[ns]')
+    
+    yhat_all = np.empty(total, dtype=np.float32)
+    yhat_all[:n] = hist_yhat
+    yhat_all[n:] = future_yhat
+    
+    # Confidence interval for all rows in one pass per bound
+    yhat_lower = yhat_all - band
+    yhat_upper = yhat_all + band
+    
+    return pd.DataFrame({'ds': ds_all, 'yhat': yhat_all, 'yhat_lower': yhat_lower, 'yhat_upper': yhat_upper})
+
+def fit_linear_trend(y: np.ndarray) -> Tuple[float, float]:
+    """Closed-form least-squares (slope, intercept) of y against 0..n-1"""
+    n = y.size
+    x_mean = (n - 1) / 2
+    y_mean = y.mean()
+    x_centered = np.arange(n) - x_mean
+    ss_x = (x_centered * x_centered).sum()
+    slope = (x_centered * (y - y_mean)).sum() / ss_x if ss_x > 0 else 0.0
+    intercept = y_mean - slope * x_mean
+    return float(slope), float(intercept)
 
 def linear_trend_forecast(data: pd.DataFrame, periods: int) -> pd.DataFrame:
     """Simple linear trend forecasting that returns a DataFrame like Prophet"""
-    df = data.copy()
-    df['ds'] = pd.to_datetime(df['ds'])
-    df = df.sort_values('ds').reset_index(drop=True)
+    df = _prepare_history(data)
+    ds = df['ds'].to_numpy(dtype='datetime64[ns]')
     
     # Calculate linear trend
-    x = np.arange(len(df))
-    y = df['y'].values
+    x = np.arange(len(df), dtype=np.float32)
+    y = df['y'].to_numpy(np.float32)
     
     # Linear regression
-    A = np.vstack([x, np.ones(len(x))]).T
-    slope, intercept = np.linalg.lstsq(A, y, rcond=None)[0]
+    slope, intercept = fit_linear_trend(y)
     
     # Generate future dates
     last_date = df['ds'].iloc[-1]
-    future_dates = [last_date + timedelta(days=i+1) for i in range(periods)]
+    future_dates = pd.date_range(start=last_date + pd.Timedelta(days=1), periods=periods, freq='D')
     
     # Forecast with linear trend
-    future_x = np.arange(len(df), len(df) + periods)
+    future_x = np.arange(len(df), len(df) + periods, dtype=np.float32)
     forecast_values = slope * future_x + intercept
     
     # Add some confidence intervals (simple approach)
-    residuals = y - (slope * x + intercept)
-    std_error = np.std(residuals)
+    fitted = slope * x + intercept
+    band = float(1.96 * np.std(y - fitted))
     
-    # Create forecast DataFrame (like Prophet output)
-    forecast_df = df.copy()
-    
-    # Add historical predictions
-    forecast_df['yhat'] = slope * x + intercept
-    forecast_df['yhat_lower'] = forecast_df['yhat'] - 1.96 * std_error
-    forecast_df['yhat_upper'] = forecast_df['yhat'] + 1.96 * std_error
-    
-    # Add future predictions
-    future_df = pd.DataFrame({
-        'ds': future_dates,
-        'yhat': forecast_values,
-        'yhat_lower': forecast_values - 1.96 * std_error,
-        'yhat_upper': forecast_values + 1.96 * std_error
-    })
-    
-    # Combine historical and future
-    result_df = pd.concat([forecast_df, future_df], ignore_index=True)
+    # Combine historical and future predictions (like Prophet output)
+    result_df = _combine_forecast(ds, fitted, future_dates, forecast_values, band)
     
     return result_df
 
 def moving_average_forecast(data: pd.DataFrame, periods: int, window: int = 7) -> pd.DataFrame:
     """Moving average forecasting that returns a DataFrame like Prophet"""
-    df = data.copy()
-    df['ds'] = pd.to_datetime(df['ds'])
-    df = df.sort_values('ds').reset_index(drop=True)
+    df = _prepare_history(data)
+    ds = df['ds'].to_numpy(dtype='datetime64[ns]')
+    
+    y = df['y'].to_numpy(np.float32)
+    band = float(1.96 * y.std(ddof=1))
     
     # Calculate moving average
-    df['ma'] = df['y'].rolling(window=window, min_periods=1).mean()
+    ma = _sma(y, window)
     
     # Use last moving average as forecast
-    last_ma = df['ma'].iloc[-1]
+    last_ma = ma[-1]
     last_date = df['ds'].iloc[-1]
     
     # Generate future dates and forecasts
-    future_dates = [last_date + timedelta(days=i+1) for i in range(periods)]
-    
-    # Simple seasonality detection (day of week effect)
-    df['day_of_week'] = df['ds'].dt.dayofweek
-    weekly_pattern = df.groupby('day_of_week')['y'].mean() - df['y'].mean()
+    future_dates = pd.date_range(start=last_date + pd.Timedelta(days=1), periods=periods, freq='D')
     
-    # Create forecast DataFrame
-    forecast_df = df.copy()
-    forecast_df['yhat'] = df['ma']
-    std_dev = df['y'].std()
-    forecast_df['yhat_lower'] = forecast_df['yhat'] - 1.96 * std_dev
-    forecast_df['yhat_upper'] = forecast_df['yhat'] + 1.96 * std_dev
+    # Simple seasonality detection (day of week effect) as a 7-bin reduction;
+    # weekdays absent from the history get no adjustment
+    day_of_week = df['ds'].dt.dayofweek.to_numpy()
+    sums = np.bincount(day_of_week, weights=y, minlength=7)
+    counts = np.bincount(day_of_week, minlength=7)
+    weekly_pattern = np.where(counts > 0, sums / np.maximum(counts, 1) - y.mean(), 0.0)
     
     # Add future predictions
-    future_data = []
-    for i, date in enumerate(future_dates):
-        day_of_week = date.weekday()
-        seasonal_adj = weekly_pattern.get(day_of_week, 0)
-        base_value = last_ma + seasonal_adj
-        
-        future_data.append({
-            'ds': date,
-            'yhat': base_value,
-            'yhat_lower': base_value - 1.96 * std_dev,
-            'yhat_upper': base_value + 1.96 * std_dev
-        })
-    
-    future_df = pd.DataFrame(future_data)
+    seasonal_adj = weekly_pattern[future_dates.dayofweek.to_numpy()]
+    base_values = last_ma + seasonal_adj
     
     # Combine historical and future
-    result_df = pd.concat([forecast_df[['ds', 'yhat', 'yhat_lower', 'yhat_upper']], future_df], ignore_index=True)
+    result_df = _combine_forecast(ds, ma, future_dates, base_values, band)
     
     return result_df
 
 def exponential_smoothing_forecast(data: pd.DataFrame, periods: int, alpha: float = 0.3) -> pd.DataFrame:
     """Exponential smoothing forecasting that returns a DataFrame like Prophet"""
-    df = data.copy()
-    df['ds'] = pd.to_datetime(df['ds'])
-    df = df.sort_values('ds').reset_index(drop=True)
+    df = _prepare_history(data)
+    ds = df['ds'].to_numpy(dtype='datetime64[ns]')
+    
+    y = df['y'].to_numpy(np.float32)
+    band = float(1.96 * y.std(ddof=1))
     
     # Exponential smoothing
-    smoothed = [df['y'].iloc[0]]
-    for i in range(1, len(df)):
-        smoothed.append(alpha * df['y'].iloc[i] + (1 - alpha) * smoothed[-1])
+    smoothed = _ewma_loop(y, alpha)
     
     # Forecast
     last_smoothed = smoothed[-1]
     last_date = df['ds'].iloc[-1]
-    future_dates = [last_date + timedelta(days=i+1) for i in range(periods)]
-    
-    # Create forecast DataFrame
-    forecast_df = df.copy()
-    forecast_df['yhat'] = smoothed
-    std_dev = df['y'].std()
-    forecast_df['yhat_lower'] = forecast_df['yhat'] - 1.96 * std_dev
-    forecast_df['yhat_upper'] = forecast_df['yhat'] + 1.96 * std_dev
+    future_dates = pd.date_range(start=last_date + pd.Timedelta(days=1), periods=periods, freq='D')
     
     # Add future predictions
-    future_data = []
-    for date in future_dates:
-        future_data.append({
-            'ds': date,
-            'yhat': last_smoothed,
-            'yhat_lower': last_smoothed - 1.96 * std_dev,
-            'yhat_upper': last_smoothed + 1.96 * std_dev
-        })
-    
-    future_df = pd.DataFrame(future_data)
+    forecast_values = np.full(periods, last_smoothed, dtype=np.float32)
     
     # Combine historical and future
-    result_df = pd.concat([forecast_df[['ds', 'yhat', 'yhat_lower', 'yhat_upper']], future_df], ignore_index=True)
+    result_df = _combine_forecast(ds, smoothed, future_dates, forecast_values, band)
     
     return result_df
\ No newline at end of file
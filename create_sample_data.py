@@ -6,6 +6,42 @@ Script to create sample Excel data for testing the Prophet Forecasting App
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from functools import lru_cache
+
+# One calendar spans every generator in this script and create_real_data.py; date_features
+# slices it instead of decomposing the timestamps again for each generator
+CALENDAR_START = datetime(2019, 1, 1)
+CALENDAR_END = datetime(2024, 1, 31)
+
+def _decompose(dates):
+    """Weekday, month and day-of-year arrays of a DatetimeIndex"""
+    weekday = dates.weekday.values.astype(np.int8)
+    month = dates.month.values.astype(np.int8)
+    day_of_year = dates.dayofyear.values.astype(np.int16)
+    return weekday, month, day_of_year
+
+@lru_cache(maxsize=None)
+def _calendar():
+    """Daily index for [CALENDAR_START, CALENDAR_END] with read-only feature arrays, built once per process"""
+    dates = pd.date_range(start=CALENDAR_START, end=CALENDAR_END, freq='D')
+    features = _decompose(dates)
+    for arr in features:
+        arr.setflags(write=False)
+    return (dates,) + features
+
+def date_features(start_date, end_date):
+    """Daily DatetimeIndex for [start_date, end_date] with its weekday, month and day-of-year arrays.
+
+    Spans inside the shared calendar are returned as slices of it; those arrays are views shared
+    with every other generator and therefore read-only.
+    """
+    if CALENDAR_START <= start_date and end_date <= CALENDAR_END:
+        first = (start_date - CALENDAR_START).days
+        stop = (end_date - CALENDAR_START).days + 1
+        return tuple(column[first:stop] for column in _calendar())
+    
+    dates = pd.date_range(start=start_date, end=end_date, freq='D')
+    return (dates,) + _decompose(dates)
 
 def create_sample_data():
     """Create sample time series data with trend and seasonality"""
@@ -13,34 +49,35 @@ def create_sample_data():
     # Generate dates for the last 2 years
     start_date = datetime(2022, 1, 1)
     end_date = datetime(2023, 12, 31)
-    dates = pd.date_range(start=start_date, end=end_date, freq='D')
+    dates, weekday, month, day_of_year = date_features(start_date, end_date)
+    n = len(dates)
     
     # Create synthetic data with trend, seasonality, and noise
-    np.random.seed(42)  # For reproducible results
-    
-    values = []
-    for i, date in enumerate(dates):
-        # Base trend
-        trend = 100 + i * 0.1
-        
-        # Yearly seasonality (peak in summer)
-        yearly = 20 * np.sin(2 * np.pi * date.timetuple().tm_yday / 365.25)
-        
-        # Weekly seasonality (lower on weekends)
-        weekly = -5 if date.weekday() >= 5 else 5
-        
-        # Random noise
-        noise = np.random.normal(0, 5)
-        
-        # Combine components
-        value = trend + yearly + weekly + noise
-        values.append(max(0, value))  # Ensure non-negative values
-    
-    # Create DataFrame
+    rng = np.random.default_rng(42)  # For reproducible results
+    
+    idx = np.arange(n)
+    
+    # Base trend
+    trend = 100 + idx * 0.1
+    
+    # Yearly seasonality (peak in summer)
+    yearly = 20 * np.sin(2 * np.pi * day_of_year / 365.25)
+    
+    # Weekly seasonality (lower on weekends)
+    weekly = np.where(weekday >= 5, -5, 5)
+    
+    # Random noise
+    noise = rng.standard_normal(n, dtype=np.float32) * 5
+    
+    # Combine components
+    values = trend + yearly + weekly + noise
+    values = np.maximum(values, 0, out=values).astype(np.float32)  # Ensure non-negative values
+    
+    # Create DataFrame around the typed arrays without copying them
     df = pd.DataFrame({
         'ds': dates,
         'y': values
-    })
+    }, copy=False)
     
     return df
 
@@ -49,37 +86,34 @@ def create_sales_data():
     
     start_date = datetime(2022, 1, 1)
     end_date = datetime(2023, 12, 31)
-    dates = pd.date_range(start=start_date, end=end_date, freq='D')
+    dates, weekday, month, day_of_year = date_features(start_date, end_date)
+    n = len(dates)
+    
+    rng = np.random.default_rng(123)
+    
+    idx = np.arange(n)
+    day = dates.day.values
+    
+    # Base sales with growth
+    base_sales = 1000 + idx * 2
     
-    np.random.seed(123)
-    
-    values = []
-    for i, date in enumerate(dates):
-        # Base sales with growth
-        base_sales = 1000 + i * 2
-        
-        # Seasonal effects
-        month_effect = 200 * np.sin(2 * np.pi * (date.month - 1) / 12)  # Peak in summer
-        week_effect = 100 if date.weekday() < 5 else -50  # Weekday vs weekend
-        
-        # Holiday effects (simplified)
-        if date.month == 12 and date.day > 20:  # Holiday season
-            holiday_effect = 300
-        elif date.month == 11 and date.day > 20:  # Black Friday period
-            holiday_effect = 200
-        else:
-            holiday_effect = 0
-        
-        # Random noise
-        noise = np.random.normal(0, 50)
-        
-        value = base_sales + month_effect + week_effect + holiday_effect + noise
-        values.append(max(0, int(value)))
+    # Seasonal effects
+    month_effect = 200 * np.sin(2 * np.pi * (month - 1) / 12)  # Peak in summer
+    week_effect = np.where(weekday < 5, 100, -50)  # Weekday vs weekend
+    
+    # Holiday effects (simplified): holiday season, Black Friday period
+    holiday_effect = np.select([(month == 12) & (day > 20), (month == 11) & (day > 20)], [300, 200], default=0)
+    
+    # Random noise
+    noise = rng.standard_normal(n, dtype=np.float32) * 50
+    
+    value = base_sales + month_effect + week_effect + holiday_effect + noise
+    values = np.maximum(value, 0, out=value).astype(np.int32)
     
     df = pd.DataFrame({
         'ds': dates,
         'y': values
-    })
+    }, copy=False)
     
     return df
 
@@ -88,40 +122,37 @@ def create_website_traffic_data():
     
     start_date = datetime(2023, 1, 1)
     end_date = datetime(2023, 12, 31)
-    dates = pd.date_range(start=start_date, end=end_date, freq='D')
+    dates, weekday, month, day_of_year = date_features(start_date, end_date)
+    n = len(dates)
+    
+    rng = np.random.default_rng(456)
+    
+    idx = np.arange(n)
+    
+    # Base traffic with growth
+    base_traffic = 5000 + idx * 10
+    
+    # Weekly seasonality (higher on weekdays)
+    weekly_effect = np.where(weekday < 5, 2000, -1000)
+    
+    # Monthly seasonality
+    monthly_effect = 1000 * np.sin(2 * np.pi * (month - 1) / 12)
+    
+    # Random events (viral content, marketing campaigns), 5% chance of spike
+    event_roll = rng.random(n)
+    event_amount = rng.integers(2000, 8000, n)
+    event_effect = np.where(event_roll < 0.05, event_amount, 0)
+    
+    # Random noise
+    noise = rng.standard_normal(n, dtype=np.float32) * 200
     
-    np.random.seed(456)
-    
-    values = []
-    for i, date in enumerate(dates):
-        # Base traffic with growth
-        base_traffic = 5000 + i * 10
-        
-        # Weekly seasonality (higher on weekdays)
-        if date.weekday() < 5:  # Monday to Friday
-            weekly_effect = 2000
-        else:  # Weekend
-            weekly_effect = -1000
-        
-        # Monthly seasonality
-        monthly_effect = 1000 * np.sin(2 * np.pi * (date.month - 1) / 12)
-        
-        # Random events (viral content, marketing campaigns)
-        if np.random.random() < 0.05:  # 5% chance of spike
-            event_effect = np.random.randint(2000, 8000)
-        else:
-            event_effect = 0
-        
-        # Random noise
-        noise = np.random.normal(0, 200)
-        
-        value = base_traffic + weekly_effect + monthly_effect + event_effect + noise
-        values.append(max(0, int(value)))
+    value = base_traffic + weekly_effect + monthly_effect + event_effect + noise
+    values = np.maximum(value, 0, out=value).astype(np.int32)
     
     df = pd.DataFrame({
         'ds': dates,
         'y': values
-    })
+    }, copy=False)
     
     return df
 
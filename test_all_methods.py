@@ -3,8 +3,13 @@
 Test script that tries different forecasting methods
 """
 
-import requests
-import json
+import asyncio
+import io
+import re
+import zipfile
+
+import httpx
+import openpyxl
 
 # Test data
 test_data = {
@@ -28,16 +33,14 @@ test_data = {
     }
 }
 
-def test_method(method_name):
+API_URL = "http://localhost:8001"
+
+async def test_method(client, method_name):
     print(f"\n🧪 Testing {method_name} method...")
-    test_data["config"]["forecast_method"] = method_name
+    payload = {**test_data, "config": {**test_data["config"], "forecast_method": method_name}}
     
     try:
-        response = requests.post(
-            "http://localhost:8001/api/forecast",
-            json=test_data,
-            headers={"Content-Type": "application/json"}
-        )
+        response = await client.post(f"{API_URL}/api/forecast", json=payload)
         
         if response.status_code == 200:
             result = response.json()
@@ -56,36 +59,82 @@ def test_method(method_name):
         print(f"❌ {method_name} error: {e}")
         return False
 
-def main():
-    print("🚀 Testing Prophet Forecasting API...")
+def build_workbook(rows=20, stale_dimension=False, active_notes_sheet=False):
+    """Build an .xlsx with ds/y on the first sheet, optionally with the quirks some exporters produce"""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["ds", "y"])
+    for day in range(1, rows + 1):
+        ws.append([f"2024-01-{day:02d}", 100 + day])
+    if active_notes_sheet:
+        # A second sheet left active when the file was saved
+        notes = wb.create_sheet("Notes")
+        notes.append(["Exported for forecasting"])
+        wb.active = notes
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    if not stale_dimension:
+        return buffer.getvalue()
     
-    # Test server connection
-    try:
-        response = requests.get("http://localhost:8001/")
-        print(f"✅ Server is running: {response.json()['message']}")
-    except:
-        print("❌ Cannot connect to server!")
-        return
+    # Rewrite the sheet XML with a <dimension> that claims only A1, copying every other member unchanged
+    stale = io.BytesIO()
+    with zipfile.ZipFile(buffer) as src, zipfile.ZipFile(stale, "w", zipfile.ZIP_DEFLATED) as dst:
+        for item in src.infolist():
+            content = src.read(item.filename)
+            if item.filename == "xl/worksheets/sheet1.xml":
+                content = re.sub(rb'<dimension ref="[^"]*"', b'<dimension ref="A1"', content)
+            dst.writestr(item, content)
+    return stale.getvalue()
+
+async def test_upload(client, label, content, expected_rows=20):
+    print(f"\n🧪 Testing upload with {label}...")
+    files = {"file": ("upload.xlsx", content)}
     
-    # Test Prophet status
     try:
-        response = requests.get("http://localhost:8001/api/prophet_status")
-        status = response.json()
-        print(f"\n📊 Prophet Status:")
-        print(f"   Imported: {status.get('prophet_imported', False)}")
-        print(f"   Functional: {status.get('prophet_functional', False)}")
-        if status.get('prophet_error') or status.get('prophet_import_error'):
-            print(f"   Error: {status.get('prophet_error') or status.get('prophet_import_error')}")
+        response = await client.post(f"{API_URL}/api/upload", files=files)
+        if response.status_code == 200 and len(response.json()["data"]) == expected_rows:
+            print(f"✅ Upload with {label} parsed all {expected_rows} rows")
+            return True
+        print(f"❌ Upload with {label} failed!")
+        print(f"   Status: {response.status_code}, response: {response.text[:200]}")
+        return False
     except Exception as e:
-        print(f"❌ Could not check Prophet status: {e}")
-    
-    # Test different forecasting methods
-    methods = ["linear_trend", "moving_average", "exponential_smoothing", "prophet"]
-    working_methods = []
+        print(f"❌ Upload with {label} error: {e}")
+        return False
+
+async def run_tests():
+    print("🚀 Testing Prophet Forecasting API...")
     
-    for method in methods:
-        if test_method(method):
-            working_methods.append(method)
+    # One client reuses a keep-alive connection for every request
+    async with httpx.AsyncClient(timeout=120) as client:
+        # Test server connection
+        try:
+            response = await client.get(f"{API_URL}/")
+            print(f"✅ Server is running: {response.json()['message']}")
+        except Exception:
+            print("❌ Cannot connect to server!")
+            return
+        
+        # Test Prophet status
+        try:
+            response = await client.get(f"{API_URL}/api/prophet_status")
+            status = response.json()
+            print(f"\n📊 Prophet Status:")
+            print(f"   Imported: {status.get('prophet_imported', False)}")
+            print(f"   Functional: {status.get('prophet_functional', False)}")
+            if status.get('prophet_error') or status.get('prophet_import_error'):
+                print(f"   Error: {status.get('prophet_error') or status.get('prophet_import_error')}")
+        except Exception as e:
+            print(f"❌ Could not check Prophet status: {e}")
+        
+        # Test Excel uploads that exporters commonly produce
+        await test_upload(client, "a stale sheet dimension", build_workbook(stale_dimension=True))
+        await test_upload(client, "a notes sheet left active", build_workbook(active_notes_sheet=True))
+        
+        # Test different forecasting methods concurrently
+        methods = ["linear_trend", "moving_average", "exponential_smoothing", "prophet"]
+        results = await asyncio.gather(*(test_method(client, method) for method in methods))
+        working_methods = [method for method, ok in zip(methods, results) if ok]
     
     print(f"\n🎯 Summary:")
     print(f"   Working methods: {working_methods}")
@@ -93,5 +142,8 @@ def main():
         print(f"   📝 To enable Prophet, see: backend/PROPHET_SETUP.md")
         print(f"   💡 For now, use: linear_trend, moving_average, or exponential_smoothing")
 
+def main():
+    asyncio.run(run_tests())
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -4,7 +4,15 @@ Quick test script to verify the forecast endpoint works
 """
 
 import requests
-import json
+
+try:
+    import orjson
+    dumps = orjson.dumps
+except ImportError:
+    import json
+
+    def dumps(obj):
+        return json.dumps(obj).encode('utf-8')
 
 # Test data
 test_data = {
@@ -29,17 +37,19 @@ test_data = {
 }
 
 def test_server():
+    # One session keeps the connection alive across requests
+    session = requests.Session()
     try:
         # Test if server is running
-        response = requests.get("http://localhost:8001/")
+        response = session.get("http://localhost:8001/")
         print(f"Server status: {response.status_code}")
         print(f"Server response: {response.json()}")
         
         # Test forecast endpoint
         print("\nTesting forecast endpoint...")
-        response = requests.post(
+        response = session.post(
             "http://localhost:8001/api/forecast",
-            json=test_data,
+            data=dumps(test_data),
             headers={"Content-Type": "application/json"}
         )
         
@@ -60,6 +70,8 @@ def test_server():
         print("❌ Cannot connect to server. Is it running on port 8001?")
     except Exception as e:
         print(f"❌ Error: {e}")
+    finally:
+        session.close()
 
 if __name__ == "__main__":
     test_server()
\ No newline at end of file